@@ -1,156 +1,282 @@
+import copy
+import heapq
+import io
 import math
+import os
+from bisect import bisect_left
 from collections import Counter
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import lru_cache
+from itertools import accumulate
+from operator import mul
+from typing import Dict, List, Optional, Tuple
 import time
 
 
+# Максимальная длина кода, для которой строится таблица декодирования
+# (таблица содержит 2^MAX_TABLE_BITS элементов)
+MAX_TABLE_BITS = 16
+
+# Поддерживаемые алгоритмы построения кодов и их названия для отчетов
+ALGORITHMS = {"fano": "ФАНО", "huffman": "ХАФФМАНА"}
+
+# Сколько последних кодировщиков хранит get_encoder
+ENCODER_CACHE_SIZE = 32
+
+
+def calculate_entropy(probabilities: Dict[str, float]) -> float:
+    """Энтропия источника -Σ p·log2(p) в битах на символ"""
+    # Нулевые вероятности не дают вклада; произведения и сумма
+    # вычисляются через map без промежуточного генератора
+    probs = list(filter(None, probabilities.values()))
+    return -sum(map(mul, probs, map(math.log2, probs)))
+
+
+def _preview(text: str, limit: int = 100) -> str:
+    """Первые limit символов строки для вывода (с многоточием, если обрезано)"""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + "..."
+
+
+def average_code_length(codes: Dict[str, str],
+                        probabilities: Dict[str, float]) -> float:
+    """Средняя длина кода Σ p·l в битах на символ"""
+    return sum(map(mul, map(probabilities.__getitem__, codes),
+                   map(len, codes.values())))
+
+
 class FanoEncoder:
-    """Класс для кодирования текста алгоритмом Фано"""
+    """
+    Класс для кодирования текста алгоритмом Фано.
+    При algorithm="huffman" коды строятся алгоритмом Хаффмана (оптимальные
+    по средней длине) для сравнения с Фано при том же интерфейсе
+    """
     
-    def __init__(self, text: str, verbose: bool = True):
+    def __init__(self, text: str, verbose: bool = True,
+                 algorithm: str = "fano"):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Неизвестный алгоритм: {algorithm!r}, "
+                             f"допустимы: {', '.join(ALGORITHMS)}")
         self.text = text
         self.verbose = verbose
+        self.algorithm = algorithm
         self.codes = {}
+        self.codes_int = {}
         self.probabilities = {}
+        self._entropy = None
         self._build_codes()
     
-    def _calculate_probabilities(self) -> List[Tuple[str, float]]:
-        """Вычисляет вероятности появления символов"""
-        counter = Counter(self.text)
-        total = len(self.text)
-        probs = [(char, count / total) for char, count in counter.items()]
-        # Сортируем по убыванию вероятности
-        probs.sort(key=lambda x: x[1], reverse=True)
-        return probs
+    @property
+    def entropy(self) -> float:
+        """Энтропия источника (бит/символ), вычисляется один раз"""
+        if self._entropy is None:
+            self._entropy = calculate_entropy(self.probabilities)
+        return self._entropy
+    
+    def _calculate_counts(self) -> List[Tuple[str, int]]:
+        """Подсчитывает частоты появления символов"""
+        # most_common() сортирует по убыванию частоты с ключом itemgetter,
+        # без вызова lambda на каждое сравнение
+        return Counter(self.text).most_common()
     
-    def _med(self, probs: List[Tuple[str, float]], b: int, e: int) -> int:
+    def _med(self, b: int, e: int) -> int:
         """
         Находит медиану - индекс m такой, что сумма P[b..m] наиболее близка
-        к сумме P[(m+1)..e]
+        к сумме P[(m+1)..e]. Использует накопленные целые частоты self._cum
+        и двоичный поиск, поэтому работает за O(log n) и без ошибок округления
         """
         if b >= e:
             return b
         
-        # Вычисляем суммы для всех возможных разбиений
-        total_sum = sum(p for _, p in probs[b:e+1])
-        left_sum = 0
-        min_diff = float('inf')
-        best_m = b
+        cum = self._cum
+        base = cum[b - 1] if b > 0 else 0
+        # Разность |left - right| = |2·cum[m] - base - cum[e]| минимальна
+        # в точке, где cum[m] пересекает середину отрезка
+        target = (base + cum[e] + 1) // 2
+        m = min(bisect_left(cum, target, b, e), e - 1)
         
-        for m in range(b, e):
-            left_sum += probs[m][1]
-            right_sum = total_sum - left_sum
-            diff = abs(left_sum - right_sum)
-            
-            if diff < min_diff:
-                min_diff = diff
-                best_m = m
+        # Проверяем соседний индекс слева: при равенстве выбираем меньший m
+        if m > b and (abs(2 * cum[m - 1] - base - cum[e])
+                      <= abs(2 * cum[m] - base - cum[e])):
+            m -= 1
         
-        return best_m
+        return m
     
-    def _fano_recursive(self, probs: List[Tuple[str, float]], 
-                       codes: Dict[str, str], b: int, e: int, 
-                       current_code: str = ""):
+    def _fano_recursive(self, probs: List[Tuple[str, int]], 
+                       codes: Dict[str, Tuple[int, int]], b: int, e: int, 
+                       prefix: int = 0, length: int = 0):
         """
-        Рекурсивная процедура Фано
+        Рекурсивная процедура Фано, развернутая в цикл с явным стеком
+        частей (b, e, код): нет накладных расходов на вызовы функций
+        и ограничения глубины рекурсии. Код хранится парой
+        (значение, длина в битах)
         b - начало обрабатываемой части
         e - конец обрабатываемой части
         """
-        if e < b:
-            return
+        stack = [(b, e, prefix, length)]
         
-        if e == b:
-            # Единственный символ - присваиваем текущий код
-            codes[probs[b][0]] = current_code if current_code else "0"
+        while stack:
+            b, e, prefix, length = stack.pop()
+            
+            if e < b:
+                continue
+            
+            if e == b:
+                # Единственный символ - присваиваем текущий код
+                codes[probs[b][0]] = (prefix, length) if length else (0, 1)
+                continue
+            
+            # Находим медиану
+            m = self._med(b, e)
+            
+            # Обрабатываем две части; левая кладется в стек последней,
+            # чтобы обход шел в том же порядке, что и при рекурсии.
+            # Коды присваиваются только в листьях
+            prefix <<= 1
+            length += 1
+            stack.append((m + 1, e, prefix | 1, length))
+            stack.append((b, m, prefix, length))
+    
+    def _huffman(self, probs: List[Tuple[str, int]],
+                 codes: Dict[str, Tuple[int, int]]):
+        """
+        Процедура Хаффмана: многократно объединяет два узла с наименьшими
+        частотами, затем обходит полученное дерево и присваивает коды
+        (значение, длина в битах) листьям
+        """
+        if not probs:
             return
         
-        # Находим медиану
-        m = self._med(probs, b, e)
-        
-        # Присваиваем коды
-        for i in range(b, m + 1):
-            char = probs[i][0]
-            codes[char] = current_code + "0"
-        
-        for i in range(m + 1, e + 1):
-            char = probs[i][0]
-            codes[char] = current_code + "1"
+        # Узел дерева - индекс символа в probs либо пара (левый, правый).
+        # Порядковый номер разрешает равенство частот без сравнения узлов
+        heap = [(count, i, i) for i, (_, count) in enumerate(probs)]
+        heapq.heapify(heap)
+        order = len(heap)
+        while len(heap) > 1:
+            count_left, _, left = heapq.heappop(heap)
+            count_right, _, right = heapq.heappop(heap)
+            heapq.heappush(heap, (count_left + count_right, order, (left, right)))
+            order += 1
         
-        # Рекурсивно обрабатываем две части
-        self._fano_recursive(probs, codes, b, m, current_code + "0")
-        self._fano_recursive(probs, codes, m + 1, e, current_code + "1")
+        stack = [(heap[0][2], 0, 0)]
+        while stack:
+            node, prefix, length = stack.pop()
+            if isinstance(node, int):
+                # Единственный символ получает код "0"
+                codes[probs[node][0]] = (prefix, length) if length else (0, 1)
+                continue
+            
+            prefix <<= 1
+            length += 1
+            stack.append((node[1], prefix | 1, length))
+            stack.append((node[0], prefix, length))
     
     def _build_codes(self):
-        """Строит коды Фано для всех символов"""
-        probs = self._calculate_probabilities()
+        """Строит коды Фано (или Хаффмана) для всех символов"""
+        # Работаем с целыми частотами: сравнение сумм точное, а вероятности
+        # нужны только для отчетов и энтропии
+        probs = self._calculate_counts()
+        self._counts = dict(probs)
+        total = len(self.text)
+        self.probabilities = {char: count / total for char, count in probs}
+        if self.algorithm == "huffman":
+            self._huffman(probs, self.codes_int)
+        else:
+            # Накопленные суммы частот для быстрого поиска медианы
+            self._cum = list(accumulate(count for _, count in probs))
+            
+            # Запускаем рекурсивную процедуру Фано
+            self._fano_recursive(probs, self.codes_int, 0, len(probs) - 1)
         
-        if self.verbose:
-            print("=" * 80)
-            print("ПОСТРОЕНИЕ КОДОВ ФАНО")
-            print("=" * 80)
-            print(f"\nИсходный текст ({len(self.text)} символов):")
-            print(f'"{self.text[:100]}{"..." if len(self.text) > 100 else ""}"')
-            print(f"\nВероятности символов (отсортированы по убыванию):")
-            print(f"{'Символ':<10} {'Вероятность':<15} {'Частота'}")
-            print("-" * 40)
-        
-        for char, prob in probs:
-            self.probabilities[char] = prob
-            if self.verbose:
-                display_char = repr(char) if char in ['\n', '\t', ' '] else char
-                count = int(prob * len(self.text))
-                print(f"{display_char:<10} {prob:<15.6f} {count}")
-        
-        # Запускаем рекурсивную процедуру Фано
-        self._fano_recursive(probs, self.codes, 0, len(probs) - 1)
+        # Строковая форма кодов для encode и отчетов
+        self.codes = {char: format(value, f"0{length}b")
+                      for char, (value, length) in self.codes_int.items()}
+        
+        # Таблица для декодирования за одно обращение на символ
+        self._max_len = max((length for _, length in self.codes_int.values()),
+                            default=0)
+        if self.codes and self._max_len <= MAX_TABLE_BITS:
+            self._decode_table = self._build_decode_table()
+        else:
+            self._decode_table = None
+        
+        # Обратный словарь нужен только побитовому декодированию
+        # и строится при первом обращении к нему
+        self._reverse_codes = None
         
         if self.verbose:
-            print("\n" + "=" * 80)
-            print("ПОСТРОЕННЫЕ КОДЫ")
-            print("=" * 80)
-            print(f"{'Символ':<10} {'Код':<15} {'Длина':<10} p·l")
-            print("-" * 50)
-            
-            avg_length = 0
-            for char, code in sorted(self.codes.items(), 
-                                    key=lambda x: len(x[1])):
-                display_char = repr(char) if char in ['\n', '\t', ' '] else char
-                prob = self.probabilities[char]
-                weighted = prob * len(code)
-                avg_length += weighted
-                print(f"{display_char:<10} {code:<15} {len(code):<10} {weighted:.4f}")
-            
-            print("-" * 50)
-            print(f"Средняя длина кода: {avg_length:.4f} бит/символ")
-            print("=" * 80 + "\n")
+            self._print_build_report()
     
-    def encode(self) -> str:
-        """Кодирует текст и возвращает битовую строку"""
-        encoded = ''.join(self.codes[char] for char in self.text)
+    def _print_build_report(self):
+        """Печатает вероятности символов и построенные коды"""
+        print("=" * 80)
+        print(f"ПОСТРОЕНИЕ КОДОВ {ALGORITHMS[self.algorithm]}")
+        print("=" * 80)
+        print(f"\nИсходный текст ({len(self.text)} символов):")
+        print(f'"{_preview(self.text)}"')
+        print(f"\nВероятности символов (отсортированы по убыванию):")
+        print(f"{'Символ':<10} {'Вероятность':<15} {'Частота'}")
+        print("-" * 40)
         
-        if self.verbose:
-            print("КОДИРОВАНИЕ")
-            print("=" * 80)
-            preview_len = min(20, len(self.text))
-            print(f"Первые {preview_len} символов:")
-            for i, char in enumerate(self.text[:preview_len]):
-                display_char = repr(char) if char in ['\n', '\t', ' '] else char
-                code = self.codes[char]
-                print(f"  {display_char} → {code}")
-            
-            if len(self.text) > preview_len:
-                print(f"  ... (еще {len(self.text) - preview_len} символов)")
-            
-            print(f"\nЗакодированная строка ({len(encoded)} бит):")
-            print(f"{encoded[:100]}{'...' if len(encoded) > 100 else ''}")
-            print("=" * 80 + "\n")
+        for char, prob in self.probabilities.items():
+            display_char = repr(char) if char in ['\n', '\t', ' '] else char
+            count = self._counts[char]
+            print(f"{display_char:<10} {prob:<15.6f} {count}")
         
-        return encoded
+        print("\n" + "=" * 80)
+        print("ПОСТРОЕННЫЕ КОДЫ")
+        print("=" * 80)
+        print(f"{'Символ':<10} {'Код':<15} {'Длина':<10} p·l")
+        print("-" * 50)
+        
+        avg_length = 0
+        for char, code in sorted(self.codes.items(), 
+                                key=lambda x: len(x[1])):
+            display_char = repr(char) if char in ['\n', '\t', ' '] else char
+            prob = self.probabilities[char]
+            weighted = prob * len(code)
+            avg_length += weighted
+            print(f"{display_char:<10} {code:<15} {len(code):<10} {weighted:.4f}")
+        
+        print("-" * 50)
+        print(f"Средняя длина кода: {avg_length:.4f} бит/символ")
+        print("=" * 80 + "\n")
     
-    def decode(self, encoded: str) -> str:
-        """Декодирует битовую строку обратно в текст"""
-        # Создаем обратный словарь
-        reverse_codes = {code: char for char, code in self.codes.items()}
+    def _build_decode_table(self) -> List[Tuple[str, int]]:
+        """
+        Строит таблицу декодирования в стиле канонического кода Хаффмана:
+        элемент с индексом из следующих L бит потока (L - максимальная длина
+        кода) хранит пару (символ, длина его кода)
+        """
+        L = self._max_len
+        table = [None] * (1 << L)
+        for char, (value, length) in self.codes_int.items():
+            shift = L - length
+            start = value << shift
+            entry = (char, length)
+            for index in range(start, start + (1 << shift)):
+                table[index] = entry
+        return table
+    
+    def _decode_bits(self, encoded: str) -> List[str]:
+        """Декодирует битовую строку в список символов"""
+        if self._decode_table is not None:
+            # Один раз упаковываем строку в байты и декодируем словами
+            # по 64 бита: это быстрее, чем срез и int() на каждый символ
+            try:
+                return self._decode_packed(*self._pack_bits(encoded))
+            except ValueError:
+                # В строке есть символы кроме '0' и '1' (например, перевод
+                # строки в конце): декодируем побитово, как раньше
+                pass
+        
+        # Слишком длинные коды или посторонние символы:
+        # побитовый поиск по обратному словарю
+        if self._reverse_codes is None:
+            self._reverse_codes = {code: char for char, code in self.codes.items()}
+        reverse_codes = self._reverse_codes
         
         decoded = []
         current_code = ""
@@ -161,39 +287,190 @@ class FanoEncoder:
                 decoded.append(reverse_codes[current_code])
                 current_code = ""
         
-        result = ''.join(decoded)
+        return decoded
+    
+    def _decode_packed(self, data: bytes, nbits: int) -> List[str]:
+        """
+        Декодирует упакованные байты по таблице, подгружая поток словами
+        по 64 бита: старшие L бит буфера дают индекс в таблице, после чего
+        из буфера сдвигается длина найденного кода
+        """
+        L = self._max_len
+        table = self._decode_table
         
-        if self.verbose:
-            print("ДЕКОДИРОВАНИЕ")
-            print("=" * 80)
-            print(f"Входная битовая строка ({len(encoded)} бит):")
-            print(f"{encoded[:100]}{'...' if len(encoded) > 100 else ''}")
-            
-            preview_len = min(20, len(result))
-            print(f"\nПервые {preview_len} декодированных символов:")
-            
-            pos = 0
-            for i in range(preview_len):
-                # Находим код для этого символа
-                char = result[i]
-                code = self.codes[char]
-                display_char = repr(char) if char in ['\n', '\t', ' '] else char
-                print(f"  {code} → {display_char}")
-                pos += len(code)
-            
-            if len(result) > preview_len:
-                print(f"  ... (еще {len(result) - preview_len} символов)")
+        # Горячий цикл: все обращения к атрибутам вынесены в локальные имена
+        decoded = []
+        append = decoded.append
+        from_bytes = int.from_bytes
+        buf = 0        # битовый буфер
+        avail = 0      # число непрочитанных бит в буфере
+        offset = 0     # позиция следующего слова в data
+        remaining = nbits
+        
+        while remaining > 0:
+            if avail < L:
+                word = data[offset:offset + 8].ljust(8, b"\0")
+                buf = (buf << 64) | from_bytes(word, "big")
+                avail += 64
+                offset += 8
             
-            print(f"\nДекодированный текст ({len(result)} символов):")
-            print(f'"{result[:100]}{"..." if len(result) > 100 else ""}"')
-            print("=" * 80 + "\n")
+            entry = table[buf >> (avail - L)]
+            if entry is None:
+                break
+            char, length = entry
+            remaining -= length
+            if remaining < 0:
+                # Неполный код в конце потока отбрасывается
+                break
+            append(char)
+            avail -= length
+            buf &= (1 << avail) - 1
+        
+        return decoded
+    
+    def _encode_bits(self) -> str:
+        """Склеивает коды символов текста в битовую строку"""
+        return ''.join(map(self.codes.__getitem__, self.text))
+    
+    @staticmethod
+    def _pack_bits(bits: str) -> Tuple[bytes, int]:
+        """
+        Упаковывает битовую строку по 8 бит в байт. Возвращает байты
+        и число значащих бит; ValueError, если в строке есть символы
+        кроме '0' и '1'
+        """
+        nbits = len(bits)
+        if nbits == 0:
+            return b"", 0
+        
+        # int() допускает пробелы, '_' и знак, из-за которых число бит
+        # не совпало бы с длиной строки; цифры 2-9 отвергает сам int()
+        if not (bits.isascii() and bits.isdigit()):
+            raise ValueError("Битовая строка должна состоять из '0' и '1'")
+        
+        # Последний байт дополняется нулями справа
+        nbytes = (nbits + 7) // 8
+        value = int(bits, 2) << (nbytes * 8 - nbits)
+        return value.to_bytes(nbytes, "big"), nbits
+    
+    def encode(self) -> str:
+        """Кодирует текст и возвращает битовую строку"""
+        encoded = self._encode_bits()
+        
+        if self.verbose:
+            self._print_encode_report(encoded)
+        
+        return encoded
+    
+    def _print_encode_report(self, encoded: str):
+        """Печатает коды первых символов и закодированную строку"""
+        print("КОДИРОВАНИЕ")
+        print("=" * 80)
+        preview_len = min(20, len(self.text))
+        print(f"Первые {preview_len} символов:")
+        for char in self.text[:preview_len]:
+            display_char = repr(char) if char in ['\n', '\t', ' '] else char
+            code = self.codes[char]
+            print(f"  {display_char} → {code}")
+        
+        if len(self.text) > preview_len:
+            print(f"  ... (еще {len(self.text) - preview_len} символов)")
+        
+        print(f"\nЗакодированная строка ({len(encoded)} бит):")
+        print(_preview(encoded))
+        print("=" * 80 + "\n")
+    
+    def encode_bytes(self) -> Tuple[bytes, int]:
+        """
+        Кодирует текст в упакованном виде (8 бит в байте вместо одного
+        символа '0'/'1' на бит). Возвращает байты и число значащих бит
+        """
+        return self._pack_bits(self._encode_bits())
+    
+    def decode_bytes(self, data: bytes, nbits: int) -> str:
+        """Декодирует результат encode_bytes обратно в текст"""
+        if nbits == 0:
+            return ""
+        
+        if self._decode_table is not None:
+            return ''.join(self._decode_packed(data, nbits))
+        
+        # Без таблицы распаковываем в битовую строку
+        value = int.from_bytes(data, "big") >> (len(data) * 8 - nbits)
+        bits = format(value, f"0{nbits}b")
+        return ''.join(self._decode_bits(bits))
+    
+    def decode(self, encoded: str) -> str:
+        """Декодирует битовую строку обратно в текст"""
+        result = ''.join(self._decode_bits(encoded))
+        
+        if self.verbose:
+            self._print_decode_report(encoded, result)
         
         return result
+    
+    def _print_decode_report(self, encoded: str, result: str):
+        """Печатает входную битовую строку и декодированный текст"""
+        print("ДЕКОДИРОВАНИЕ")
+        print("=" * 80)
+        print(f"Входная битовая строка ({len(encoded)} бит):")
+        print(_preview(encoded))
+        
+        preview_len = min(20, len(result))
+        print(f"\nПервые {preview_len} декодированных символов:")
+        
+        for char in result[:preview_len]:
+            code = self.codes[char]
+            display_char = repr(char) if char in ['\n', '\t', ' '] else char
+            print(f"  {code} → {display_char}")
+        
+        if len(result) > preview_len:
+            print(f"  ... (еще {len(result) - preview_len} символов)")
+        
+        print(f"\nДекодированный текст ({len(result)} символов):")
+        print(f'"{_preview(result)}"')
+        print("=" * 80 + "\n")
+
+
+@lru_cache(maxsize=ENCODER_CACHE_SIZE)
+def _build_encoder(text: str, algorithm: str) -> FanoEncoder:
+    """Строит кодировщик без вывода; результат хранится в кэше get_encoder"""
+    encoder = FanoEncoder(text, verbose=False, algorithm=algorithm)
+    # Энтропия вычисляется до кэширования, чтобы копии ее не пересчитывали
+    encoder.entropy
+    return encoder
+
+
+def get_encoder(text: str, verbose: bool = False,
+                algorithm: str = "fano") -> FanoEncoder:
+    """
+    Возвращает кодировщик для текста, повторно используя уже построенные
+    коды для недавно встречавшихся текстов (например, при повторном вводе
+    в интерактивном режиме). Кэшируется только построение без вывода:
+    каждый вызов получает свою копию кодировщика, и при verbose отчет
+    о построении печатается заново. Таблицы кодов у копий общие,
+    изменять их нельзя
+    """
+    encoder = copy.copy(_build_encoder(text, algorithm))
+    encoder.verbose = verbose
+    if verbose:
+        encoder._print_build_report()
+    return encoder
 
 
 def compare_with_ascii(text: str, encoded: str, codes: Dict[str, str], 
-                       probabilities: Dict[str, float]):
-    """Сравнивает эффективность кодирования Фано с ASCII"""
+                       probabilities: Dict[str, float],
+                       entropy: Optional[float] = None,
+                       algorithm: str = "fano",
+                       huffman_codes: Optional[Dict[str, str]] = None):
+    """
+    Сравнивает эффективность кодирования Фано (или algorithm) с ASCII.
+    Если энтропия уже известна (FanoEncoder.entropy), она не пересчитывается.
+    Если переданы коды Хаффмана для того же текста, в отчет добавляется
+    сравнение средней длины кода с оптимальной
+    """
+    name = ALGORITHMS[algorithm].capitalize()
+    
     print("\n" + "=" * 80)
     print("СРАВНИТЕЛЬНЫЙ АНАЛИЗ ЭФФЕКТИВНОСТИ")
     print("=" * 80)
@@ -201,16 +478,16 @@ def compare_with_ascii(text: str, encoded: str, codes: Dict[str, str],
     # ASCII кодирование
     ascii_bits = len(text) * 8
     
-    # Фано кодирование
+    # Кодирование построенными кодами
     fano_bits = len(encoded)
     
     # Теоретическая энтропия
-    entropy = -sum(p * math.log2(p) for p in probabilities.values() if p > 0)
+    if entropy is None:
+        entropy = calculate_entropy(probabilities)
     theoretical_min = entropy * len(text)
     
     # Средняя длина кода
-    avg_code_length = sum(probabilities[char] * len(codes[char]) 
-                          for char in codes)
+    avg_code_length = average_code_length(codes, probabilities)
     
     # Коэффициент сжатия
     compression_ratio = (1 - fano_bits / ascii_bits) * 100
@@ -225,11 +502,11 @@ def compare_with_ascii(text: str, encoded: str, codes: Dict[str, str],
     
     print(f"\nРазмер закодированных данных:")
     print(f"  ASCII (8 бит/символ):        {ascii_bits:>10} бит ({ascii_bits / 8:.0f} байт)")
-    print(f"  Фано:                        {fano_bits:>10} бит ({fano_bits / 8:.2f} байт)")
+    print(f"  {'Код ' + name + ':':<29}{fano_bits:>10} бит ({fano_bits / 8:.2f} байт)")
     print(f"  Теоретический минимум:       {theoretical_min:>10.0f} бит ({theoretical_min / 8:.2f} байт)")
     
     print(f"\nЭффективность кодирования:")
-    print(f"  Средняя длина кода Фано: {avg_code_length:.4f} бит/символ")
+    print(f"  Средняя длина кода {name}: {avg_code_length:.4f} бит/символ")
     print(f"  Коэффициент сжатия: {compression_ratio:.2f}%")
     print(f"  Экономия памяти: {ascii_bits - fano_bits} бит ({(ascii_bits - fano_bits) / 8:.2f} байт)")
     print(f"  Эффективность относительно энтропии: {efficiency:.2f}%")
@@ -244,30 +521,24 @@ def compare_with_ascii(text: str, encoded: str, codes: Dict[str, str],
         count = length_dist[length]
         print(f"  {length} бит: {count} символов")
     
+    if huffman_codes is not None and algorithm != "huffman":
+        huffman_avg = average_code_length(huffman_codes, probabilities)
+        print(f"\nСравнение с оптимальным кодом Хаффмана:")
+        print(f"  Средняя длина кода Хаффмана: {huffman_avg:.4f} бит/символ")
+        print(f"  Избыток кода {name}: {avg_code_length - huffman_avg:.4f} бит/символ")
+    
     print("=" * 80)
 
 
-def test_fano_algorithm():
-    """Тестирование алгоритма на разных текстах"""
-    
-    test_cases = [
-        ("Короткий текст", "Hello, World!"),
-        ("Средний текст", "Алгоритм Фано строит разделимую префиксную схему " * 5),
-        ("Длинный текст", """
-        Рекурсивный алгоритм Фано строит разделимую префиксную схему алфавитного 
-        кодирования, близкого к оптимальному. Алгоритм Фано использует функцию Med, 
-        которая находит медиану указанной части массива. При каждом удлинении кодов 
-        в одной части коды удлиняются нулями, а в другой — единицами. Таким образом, 
-        коды одной части не могут быть префиксами другой. Удлинение кода заканчивается 
-        тогда и только тогда, когда длина части равна 1, то есть остается единственный код.
-        """ * 10)
-    ]
+def _run_one_test(test_case: Tuple[str, str]) -> str:
+    """
+    Выполняет один тест (построение кодов, кодирование, декодирование,
+    сравнительный анализ) и возвращает его отчет в виде строки
+    """
+    name, text = test_case
+    report = io.StringIO()
     
-    print("█" * 80)
-    print(" " * 25 + "ТЕСТИРОВАНИЕ АЛГОРИТМА ФАНО")
-    print("█" * 80 + "\n")
-    
-    for name, text in test_cases:
+    with redirect_stdout(report):
         print(f"\n{'▓' * 80}")
         print(f"ТЕСТ: {name} ({len(text)} символов)")
         print(f"{'▓' * 80}\n")
@@ -281,24 +552,72 @@ def test_fano_algorithm():
         
         # Декодируем
         decoded = encoder.decode(encoded)
-        
-        # Проверяем корректность
-        is_correct = decoded == text
         encode_time = time.time() - start_time
         
+        # Упакованное представление (не входит во время выполнения,
+        # чтобы оно оставалось сравнимым с кодированием строки)
+        packed, nbits = encoder.encode_bytes()
+        
+        # Проверяем корректность, в том числе для строки с переводом строки
+        # в конце (лишние символы после последнего кода игнорируются;
+        # _decode_bits - чтобы не печатать отчет декодирования повторно)
+        is_correct = (decoded == text
+                      and encoder.decode_bytes(packed, nbits) == text
+                      and ''.join(encoder._decode_bits(encoded + "\n")) == text)
+        
         print(f"ПРОВЕРКА КОРРЕКТНОСТИ:")
         print(f"  Исходный текст == Декодированный текст: {is_correct}")
+        # Время настенное: при параллельном запуске тестов, когда ядер меньше,
+        # чем тестов, в него входит и ожидание остальных процессов
         print(f"  Время выполнения: {encode_time:.4f} сек")
+        print(f"  Упакованный размер: {len(packed)} байт")
         
         if not is_correct:
             print("  ⚠ ОШИБКА: Декодированный текст не совпадает с исходным!")
         else:
             print("  ✓ Алгоритм работает корректно!")
         
-        # Сравнительный анализ
-        compare_with_ascii(text, encoded, encoder.codes, encoder.probabilities)
+        # Сравнительный анализ, включая оптимальный код Хаффмана
+        huffman = FanoEncoder(text, verbose=False, algorithm="huffman")
+        compare_with_ascii(text, encoded, encoder.codes, encoder.probabilities,
+                           encoder.entropy, encoder.algorithm, huffman.codes)
         
         print("\n")
+    
+    return report.getvalue()
+
+
+def test_fano_algorithm():
+    """Тестирование алгоритма на разных текстах"""
+    
+    test_cases = [
+        ("Короткий текст", "Hello, World!"),
+        ("Средний текст", "Алгоритм Фано строит разделимую префиксную схему " * 5),
+        ("Длинный текст", """
+        Рекурсивный алгоритм Фано строит разделимую префиксную схему алфавитного 
+        кодирования, близкого к оптимальному. Алгоритм Фано использует функцию Med, 
+        которая находит медиану указанной части массива. При каждом удлинении кодов 
+        в одной части коды удлиняются нулями, а в другой — единицами. Таким образом, 
+        коды одной части не могут быть префиксами другой. Удлинение кода заканчивается 
+        тогда и только тогда, когда длина части равна 1, то есть остается единственный код.
+        """ * 10)
+    ]
+    
+    print("█" * 80)
+    print(" " * 25 + "ТЕСТИРОВАНИЕ АЛГОРИТМА ФАНО")
+    print("█" * 80 + "\n")
+    
+    # Тесты независимы: при нескольких ядрах они выполняются в отдельных
+    # процессах, на одном ядре пул только добавляет затраты на запуск.
+    # Отчеты печатаются в исходном порядке, чтобы вывод не перемешивался
+    if (os.cpu_count() or 1) > 1 and len(test_cases) > 1:
+        with ProcessPoolExecutor() as executor:
+            reports = list(executor.map(_run_one_test, test_cases))
+    else:
+        reports = map(_run_one_test, test_cases)
+    
+    for report in reports:
+        print(report, end="")
 
 
 if __name__ == "__main__":
@@ -310,13 +629,23 @@ if __name__ == "__main__":
     print("=" * 80)
     print("\nВведите свой текст для кодирования (или оставьте пустым для выхода):")
     
-    user_text = input("> ")
-    
-    if user_text.strip():
+    # Повторно введенный текст берет уже построенные коды из кэша get_encoder
+    while True:
+        try:
+            user_text = input("> ")
+        except EOFError:
+            break
+        
+        if not user_text.strip():
+            break
+        
         print("\n")
-        encoder = FanoEncoder(user_text, verbose=True)
+        encoder = get_encoder(user_text, verbose=True)
         encoded = encoder.encode()
         decoded = encoder.decode(encoded)
-        compare_with_ascii(user_text, encoded, encoder.codes, encoder.probabilities)
+        compare_with_ascii(user_text, encoded, encoder.codes,
+                           encoder.probabilities, encoder.entropy,
+                           encoder.algorithm)
         
-        print(f"\nПроверка: текст корректно {'декодирован ✓' if decoded == user_text else 'НЕ декодирован ✗'}")
\ No newline at end of file
+        print(f"\nПроверка: текст корректно {'декодирован ✓' if decoded == user_text else 'НЕ декодирован ✗'}")
+        print("\nВведите следующий текст (или оставьте пустым для выхода):")